@@ -1,5 +1,5 @@
 import streamlit as st
-from db_utils import run_query, format_number, format_currency, is_sample_mode, get_dataset_info
+from db_utils import fragment, get_hero_stats, format_number, format_currency, is_sample_mode, get_dataset_info
 
 st.set_page_config(
     page_title="Behavioral Analytics Platform",
@@ -32,59 +32,66 @@ This platform demonstrates an **End to End Data Science Pipeline** processing **
 showcasing optimization techniques, analytical rigor, and ML-driven insights typically found in FAANG companies.
 """)
 
-# Hero Stats Row
-col1, col2, col3, col4, col5 = st.columns(5)
+# One round-trip for every hero/system scalar on this page
+try:
+    total_events, total_users, total_buyers, total_sessions, total_revenue, conversion_rate = get_hero_stats()
+except:
+    total_events = total_users = total_buyers = total_sessions = total_revenue = conversion_rate = None
+
+# Hero Stats Row - isolated in a fragment so interactions only rerun this
+# block, not the static markdown making up the rest of the page
+# (no-op on Streamlit builds without fragments)
+@fragment
+def hero_stats_row():
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    with col1:
+        try:
+            event_display = format_number(total_events)
+            
+            st.metric(
+                "Events Processed",
+                event_display,
+                help=f"Total behavioral events in {'sample' if is_sample_mode() else 'full'} dataset"
+            )
+        except:
+            st.metric("Events Processed", "N/A")
+
+    with col2:
+        st.metric(
+            "Memory Footprint",
+            "3.7 GB",
+            delta="-97%",
+            delta_color="inverse",
+            help="Optimized from ~120GB naive approach"
+        )
 
-with col1:
-    try:
-        # Get actual event count from database
-        event_stats = run_query("SELECT COUNT(*) as count FROM events")
-        event_count = event_stats['count'][0]
-        event_display = format_number(event_count)
-        
+    with col3:
         st.metric(
-            "Events Processed",
-            event_display,
-            help=f"Total behavioral events in {'sample' if is_sample_mode() else 'full'} dataset"
+            "Query Latency",
+            "< 1 sec",
+            help="Sub-second analytical queries"
         )
-    except:
-        st.metric("Events Processed", "N/A")
 
-with col2:
-    st.metric(
-        "Memory Footprint",
-        "3.7 GB",
-        delta="-97%",
-        delta_color="inverse",
-        help="Optimized from ~120GB naive approach"
-    )
-
-with col3:
-    st.metric(
-        "Query Latency",
-        "< 1 sec",
-        help="Sub-second analytical queries"
-    )
-
-with col4:
-    st.metric(
-        "ML Lift",
-        "4.5x",
-        delta="+350%",
-        help="Propensity model vs random"
-    )
-
-with col5:
-    try:
-        users_stats = run_query("SELECT COUNT(*) as users, SUM(CASE WHEN purchase_count > 0 THEN 1 ELSE 0 END) as buyers FROM dim_users")
-        conversion_rate = users_stats['buyers'][0] / users_stats['users'][0] * 100
+    with col4:
         st.metric(
-            "Conversion Rate",
-            f"{conversion_rate:.2f}%",
-            help="Overall user conversion"
+            "ML Lift",
+            "4.5x",
+            delta="+350%",
+            help="Propensity model vs random"
         )
-    except:
-        st.metric("Conversion Rate", "8.0%")
+
+    with col5:
+        try:
+            st.metric(
+                "Conversion Rate",
+                f"{conversion_rate:.2f}%",
+                help="Overall user conversion"
+            )
+        except:
+            st.metric("Conversion Rate", "8.0%")
+
+hero_stats_row()
 
 st.markdown("---")
 
@@ -180,21 +187,16 @@ Use the sidebar to explore different modules. Each page demonstrates specific ca
 st.markdown("---")
 
 # Quick System Stats
-try:
-    stats = run_query("SELECT COUNT(*) as events FROM events")
-    users = run_query("SELECT COUNT(*) as count FROM dim_users")
-    sessions = run_query("SELECT COUNT(*) as count FROM fact_sessions")
-    revenue = run_query("SELECT SUM(daily_revenue) as rev FROM fact_daily_kpis")
-    
+if total_events is not None:
     st.success(f"""
     🟢 **System Online**
-    - **Data Lake:** {format_number(stats['events'][0])} events processed
-    - **User Base:** {format_number(users['count'][0])} unique users
-    - **Sessions:** {format_number(sessions['count'][0])} user visits
-    - **Total Revenue:** {format_currency(revenue['rev'][0])}
+    - **Data Lake:** {format_number(total_events)} events processed
+    - **User Base:** {format_number(total_users)} unique users
+    - **Sessions:** {format_number(total_sessions)} user visits
+    - **Total Revenue:** {format_currency(total_revenue)}
     """)
-except Exception as e:
-    st.warning(f"⚠️ Database connection: {e}")
+else:
+    st.warning("⚠️ Database connection unavailable")
 
 st.markdown("---")
 
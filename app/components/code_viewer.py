@@ -1,6 +1,24 @@
 import streamlit as st
 from pathlib import Path
 
+
+@st.cache_data(show_spinner=False)
+def _read_slice(path_str: str, mtime: float, start_line: int, end_line: int) -> str:
+    """
+    Read a line range from a source file, cached per modification time.
+
+    The snippet files never change while the app runs, so each of the
+    ~6 references on the Optimization Engine page hits disk once instead
+    of on every rerun. mtime is part of the cache key purely to bust the
+    entry when the file is edited.
+    """
+    with open(path_str, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    if start_line is not None and end_line is not None:
+        lines = lines[start_line-1:end_line]
+    return ''.join(lines)
+
+
 def show_code_reference(file_path: str, start_line: int = None, end_line: int = None, description: str = ""):
     """
     Display source code reference in an expandable section.
@@ -29,20 +47,13 @@ def show_code_reference(file_path: str, start_line: int = None, end_line: int =
         with st.expander(f"🔍 View Source Code: {path.name}"):
             if description:
                 st.info(description)
-            
-            # Read file content
-            with open(path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # Extract specific lines if specified
+
+            # Cached slice read - keyed on path/mtime/range
+            code_snippet = _read_slice(str(path), path.stat().st_mtime, start_line, end_line)
+            st.code(code_snippet, language='python', line_numbers=True)
             if start_line is not None and end_line is not None:
-                # Convert to 0-indexed
-                code_snippet = ''.join(lines[start_line-1:end_line])
-                st.code(code_snippet, language='python', line_numbers=True)
                 st.caption(f"Lines {start_line}-{end_line} from `{path.name}`")
             else:
-                code_snippet = ''.join(lines)
-                st.code(code_snippet, language='python', line_numbers=True)
                 st.caption(f"Full file: `{path.name}`")
             
             # Add file reference link (show relative path)
@@ -1,4 +1,5 @@
 import streamlit as st
+from types import MappingProxyType
 
 # Technical glossary for the dashboard
 GLOSSARY = {
@@ -64,6 +65,22 @@ GLOSSARY = {
     },
 }
 
+# Freeze the glossary - it is built once at import and never mutated
+GLOSSARY = MappingProxyType(GLOSSARY)
+
+# Category groupings for show_full_glossary, resolved once at import so each
+# render iterates a prebuilt tuple instead of re-filtering the dict
+_CATEGORIES = {
+    "Data Engineering": ["DuckDB", "Polars", "Dimensional Modeling", "Categorical Encoding", "Sessionization"],
+    "Analytics & Segmentation": ["RFM", "NTILE", "Cohort Analysis"],
+    "Machine Learning": ["LightGBM", "Propensity Model"],
+    "Experimentation": ["Lift (A/B Testing)", "Lift (Market Basket)"]
+}
+_CATEGORY_ENTRIES = {
+    cat: tuple((term, GLOSSARY[term]) for term in terms if term in GLOSSARY)
+    for cat, terms in _CATEGORIES.items()
+}
+
 
 def show_glossary(term: str):
     """
@@ -91,22 +108,12 @@ def show_full_glossary():
     st.markdown("## 📚 Technical Glossary")
     st.markdown("*Key terms and concepts used throughout this dashboard*")
     
-    # Group by category
-    categories = {
-        "Data Engineering": ["DuckDB", "Polars", "Dimensional Modeling", "Categorical Encoding", "Sessionization"],
-        "Analytics & Segmentation": ["RFM", "NTILE", "Cohort Analysis"],
-        "Machine Learning": ["LightGBM", "Propensity Model"],
-        "Experimentation": ["Lift (A/B Testing)", "Lift (Market Basket)"]
-    }
-    
-    for category, terms in categories.items():
+    for category, entries in _CATEGORY_ENTRIES.items():
         st.subheader(category)
-        for term in terms:
-            if term in GLOSSARY:
-                entry = GLOSSARY[term]
-                with st.expander(f"**{term}** - {entry['full']}"):
-                    st.write(entry['definition'])
-                    st.info(f"**In this project:** {entry['application']}")
+        for term, entry in entries:
+            with st.expander(f"**{term}** - {entry['full']}"):
+                st.write(entry['definition'])
+                st.info(f"**In this project:** {entry['application']}")
         st.markdown("---")
 
 
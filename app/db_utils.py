@@ -1,32 +1,130 @@
+"""Canonical database/helper layer for the Streamlit dashboard.
+
+This is the only db_utils module; every page imports from here. Connection
+strategy, in order of preference:
+
+1. Full local database (data/db/behavior.duckdb), read-only.
+2. Pre-built sample database (data/sample/sample.duckdb), read-only.
+3. In-memory build from the sample parquet, with derived tables cached
+   under data/sample/derived/.
+"""
+
 import duckdb
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import timedelta
+import pyarrow as pa
+import functools
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
-# Detect environment
-IS_CLOUD = os.getenv('STREAMLIT_SHARING', 'false').lower() == 'true'
-SAMPLE_MODE = not os.path.exists("data/db/behavior.duckdb")
+# st.fragment shipped in Streamlit 1.33; the pinned 1.32 has neither it
+# nor the experimental alias. Fall back to a pass-through decorator so
+# pages still render - decorated sections simply rerun with the whole
+# page instead of in isolation.
+def _identity_decorator(func):
+    return func
+
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or _identity_decorator
 
 # Database paths
-if SAMPLE_MODE or IS_CLOUD:
-    PARQUET_PATH = "data/sample/sample_optimized.parquet"
-else:
-    DB_PATH = "data/db/behavior.duckdb"
-    PARQUET_PATH = None
+DB_PATH = "data/db/behavior.duckdb"
+SAMPLE_PARQUET_PATH = "data/sample/sample_optimized.parquet"
+# Pre-built sample database (scripts/create_cloud_database.py output)
+SAMPLE_DB_PATH = "data/sample/sample.duckdb"
+
+@functools.lru_cache(maxsize=1)
+def _detect_mode():
+    """Resolve environment mode once, on first use.
+
+    Keeps the stat() calls off module import (each Streamlit page imports
+    this module) and pins the decision for the session, so the answer
+    cannot flip if the full database appears mid-run.
+    """
+    is_cloud = os.getenv('STREAMLIT_SHARING', 'false').lower() == 'true'
+    sample_mode = not Path(DB_PATH).is_file()
+    return {
+        'is_cloud': is_cloud,
+        'sample_mode': sample_mode,
+        'parquet_path': SAMPLE_PARQUET_PATH if (sample_mode or is_cloud) else None,
+    }
+
+# Pre-derived table cache (amortizes CREATE TABLE cost across cold starts)
+DERIVED_DIR = Path("data/sample/derived")
+
+def _configure_connection(con, default_memory_gb):
+    """Scale DuckDB resource limits to the box instead of hardcoding them.
+
+    Memory comes from DUCKDB_MEMORY_GB (defaulting per mode), and threads
+    follow the ~1 GB-per-thread heuristic capped at the CPU count: more
+    threads than that just thrash spill buffers, fewer wastes cores.
+    preserve_insertion_order is dropped since every order-sensitive query
+    here carries its own ORDER BY. PRAGMA is the fallback spelling for
+    DuckDB builds where SET is rejected.
+    """
+    memory_gb = float(os.getenv('DUCKDB_MEMORY_GB', default_memory_gb))
+    threads = max(1, min(os.cpu_count() or 1, int(memory_gb)))
+    for set_stmt, pragma_stmt in (
+        (f"SET memory_limit='{memory_gb:g}GB';", f"PRAGMA memory_limit='{memory_gb:g}GB';"),
+        (f"SET threads TO {threads};", f"PRAGMA threads={threads};"),
+        ("SET preserve_insertion_order=false;", "PRAGMA preserve_insertion_order=false;"),
+    ):
+        try:
+            con.execute(set_stmt)
+        except duckdb.Error:
+            try:
+                con.execute(pragma_stmt)
+            except duckdb.Error:
+                pass
+
+def _build_or_load(con, name, sql):
+    """Create derived table `name`, reusing a cached parquet copy if present.
+
+    First build runs `sql` and snapshots the result to ZSTD parquet under
+    DERIVED_DIR; later cold starts load the snapshot instead of re-scanning
+    events. Pre-built parquets can also be shipped in the repo so the very
+    first cloud start skips derivation entirely.
+    """
+    parquet_path = DERIVED_DIR / f"{name}.parquet"
+    if parquet_path.exists():
+        con.execute(f"CREATE TABLE {name} AS SELECT * FROM read_parquet('{parquet_path.as_posix()}')")
+        return
 
-# Initialize connection once and cache it
+    con.execute(f"CREATE TABLE {name} AS {sql}")
+    try:
+        DERIVED_DIR.mkdir(parents=True, exist_ok=True)
+        con.execute(f"COPY {name} TO '{parquet_path.as_posix()}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+    except Exception:
+        # Read-only filesystem - just rebuild on the next cold start
+        pass
+
+# Initialize the database once and cache it
 @st.cache_resource
-def get_connection():
-    """Get database connection, creating from parquet for cloud compatibility"""
+def _db():
+    """Open (or build) the database - the expensive one-time work lives here"""
     
     # For cloud/sample mode, create database from parquet to avoid Windows/Linux compatibility
-    if IS_CLOUD or SAMPLE_MODE:
-        if not os.path.exists(PARQUET_PATH):
-            st.error(f"Sample data not found at: {PARQUET_PATH}")
+    mode = _detect_mode()
+    if mode['is_cloud'] or mode['sample_mode']:
+        parquet_path = mode['parquet_path']
+        # Prefer the pre-built sample database: attaching read-only is
+        # O(catalog) instead of re-deriving every table, and read-only lets
+        # concurrent Streamlit sessions share the file. Fall back to the
+        # in-memory build if the file is missing or binary-incompatible.
+        if os.path.exists(SAMPLE_DB_PATH):
+            try:
+                con = duckdb.connect(SAMPLE_DB_PATH, read_only=True)
+                _configure_connection(con, default_memory_gb=0.5)
+                con.execute("PRAGMA enable_object_cache;")
+                return con
+            except Exception:
+                pass
+
+        if not os.path.exists(parquet_path):
+            st.error(f"Sample data not found at: {parquet_path}")
             st.info("Please ensure sample_optimized.parquet is in the repository.")
             st.stop()
         
@@ -35,64 +133,80 @@ def get_connection():
             con = duckdb.connect(':memory:')
             
             # Configure for cloud
-            con.execute("SET memory_limit='512MB';")
-            con.execute("SET threads TO 2;")
+            _configure_connection(con, default_memory_gb=0.5)
+            # Cache parquet metadata/zonemaps so repeated read_parquet calls
+            # skip header parsing. The external file cache and forced ZSTD
+            # compression only exist on newer DuckDB versions, so apply those
+            # best-effort.
+            con.execute("PRAGMA enable_object_cache;")
+            for setting in ("SET enable_external_file_cache=true;",
+                            "PRAGMA force_compression='zstd';"):
+                try:
+                    con.execute(setting)
+                except duckdb.Error:
+                    pass
             
-            # Load events from parquet
+            # Load events from parquet; event_date is materialized once
+            # here so downstream aggregations group on it directly instead
+            # of re-casting event_time per row on every scan
+            # Explicit projection: only the columns the dashboard uses get
+            # decoded and held in memory, even if the parquet grows wider
             con.execute(f"""
                 CREATE TABLE events AS 
-                SELECT * FROM read_parquet('{PARQUET_PATH}')
+                SELECT
+                    event_time,
+                    event_type,
+                    product_id,
+                    category_id,
+                    category_code,
+                    brand,
+                    price,
+                    user_id,
+                    user_session,
+                    CAST(event_time AS DATE) AS event_date
+                FROM read_parquet('{parquet_path}')
             """)
             
+            # Derive all tables in one transaction: single catalog commit,
+            # and the optimizer is free to reuse buffered events pages
+            # across the consecutive aggregating scans
+            con.execute("BEGIN TRANSACTION;")
+
             # Create dim_products
-            con.execute("""
-                CREATE TABLE dim_products AS
-                SELECT DISTINCT ON (product_id)
+            # arg_max keeps the latest attributes per product in one
+            # streaming hash aggregate, instead of DISTINCT ON's global sort
+            # over events
+            _build_or_load(con, 'dim_products', """
+                SELECT
                     product_id,
-                    category_id,
-                    COALESCE(category_code, 'unknown') as category_code,
-                    COALESCE(brand, 'unknown') as brand,
-                    price as current_price
+                    arg_max(category_id, event_time) as category_id,
+                    COALESCE(arg_max(category_code, event_time), 'unknown') as category_code,
+                    COALESCE(arg_max(brand, event_time), 'unknown') as brand,
+                    arg_max(price, event_time) as current_price
                 FROM events
                 WHERE product_id IS NOT NULL
-                ORDER BY product_id, event_time DESC
-            """)
-            
-            # Create dim_users
-            con.execute("""
-                CREATE TABLE dim_users AS
-                SELECT 
-                    user_id,
-                    MIN(event_time) as first_seen,
-                    MAX(event_time) as last_seen,
-                    COUNT(*) as event_count,
-                    COUNT(DISTINCT user_session) as session_count,
-                    SUM(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as purchase_count,
-                    SUM(CASE WHEN event_type = 'purchase' THEN price ELSE 0 END) as total_spend
-                FROM events
-                GROUP BY user_id
+                GROUP BY product_id
             """)
             
             # Create fact_daily_kpis
-            con.execute("""
-                CREATE TABLE fact_daily_kpis AS
+            _build_or_load(con, 'fact_daily_kpis', """
                 SELECT 
-                    CAST(event_time AS DATE) as date,
+                    event_date as date,
                     COUNT(*) as daily_events,
-                    COUNT(DISTINCT user_id) as dau,
-                    COUNT(DISTINCT user_session) as daily_sessions,
-                    SUM(CASE WHEN event_type = 'view' THEN 1 ELSE 0 END) as views,
-                    SUM(CASE WHEN event_type = 'cart' THEN 1 ELSE 0 END) as carts,
-                    SUM(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as purchases,
-                    SUM(CASE WHEN event_type = 'purchase' THEN price ELSE 0 END) as daily_revenue
+                    approx_count_distinct(user_id) as dau,
+                    approx_count_distinct(user_session) as daily_sessions,
+                    COUNT(*) FILTER (WHERE event_type = 'view') as views,
+                    COUNT(*) FILTER (WHERE event_type = 'cart') as carts,
+                    COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases,
+                    COALESCE(SUM(price) FILTER (WHERE event_type = 'purchase'), 0) as daily_revenue,
+                    approx_count_distinct(user_id) FILTER (WHERE event_type = 'purchase') as unique_buyers
                 FROM events
-                GROUP BY CAST(event_time AS DATE)
+                GROUP BY event_date
                 ORDER BY date
             """)
             
             # Create fact_sessions
-            con.execute("""
-                CREATE TABLE fact_sessions AS
+            _build_or_load(con, 'fact_sessions', """
                 SELECT 
                     user_session,
                     user_id,
@@ -102,34 +216,107 @@ def get_connection():
                     COUNT(*) as event_count,
                     COUNT(DISTINCT product_id) as unique_products,
                     MAX(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as has_purchase,
-                    SUM(CASE WHEN event_type = 'purchase' THEN price ELSE 0 END) as session_revenue
+                    COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases,
+                    COALESCE(SUM(price) FILTER (WHERE event_type = 'purchase'), 0) as session_revenue
                 FROM events
                 GROUP BY user_session, user_id
             """)
             
+            # Create dim_users by re-aggregating fact_sessions instead of
+            # re-scanning events - one fewer full pass over the big table
+            _build_or_load(con, 'dim_users', """
+                SELECT 
+                    user_id,
+                    MIN(session_start) as first_seen,
+                    MAX(session_end) as last_seen,
+                    SUM(event_count) as event_count,
+                    COUNT(*) as session_count,
+                    SUM(purchases) as purchase_count,
+                    SUM(session_revenue) as total_spend,
+                    MAX(has_purchase) as is_buyer
+                FROM fact_sessions
+                GROUP BY user_id
+            """)
+            
+            # Top-N rollups for the Data Explorer: 15 rows each, so the
+            # page reads a tiny table instead of grouping and sorting the
+            # full events scan on every cold cache
+            _build_or_load(con, 'mv_top_categories', """
+                SELECT
+                    COALESCE(category_code, 'unknown') as category,
+                    COUNT(*) as events,
+                    COUNT(DISTINCT user_id) as users,
+                    COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases
+                FROM events
+                GROUP BY category_code
+                ORDER BY events DESC
+                LIMIT 15
+            """)
+            
+            # 3-row session funnel so the Executive Overview never has to
+            # distinct-count sessions over events at page load. HLL sketch
+            # instead of an exact distinct: O(1) memory on the 512MB tier,
+            # and the funnel displays rounded values and ratios only. The
+            # offline builders snapshot exact counts, which take precedence
+            # here whenever the derived parquet exists.
+            _build_or_load(con, 'fact_funnel', """
+                SELECT
+                    event_type,
+                    approx_count_distinct(user_session) as sessions
+                FROM events
+                WHERE event_type IN ('view', 'cart', 'purchase')
+                GROUP BY event_type
+            """)
+            
+            _build_or_load(con, 'mv_top_brands', """
+                SELECT
+                    COALESCE(brand, 'unknown') as brand,
+                    COUNT(*) as events,
+                    COUNT(DISTINCT user_id) as users,
+                    COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases
+                FROM events
+                GROUP BY events.brand
+                ORDER BY events DESC
+                LIMIT 15
+            """)
+            
+            con.execute("COMMIT;")
+            
             # Create user_rfm_segments (for User Intelligence page)
+            # View, not table: only materialized when that page queries it,
+            # keeping cold-start cost and peak memory down on the 512MB tier
             con.execute("""
-                CREATE TABLE user_rfm_segments AS
+                CREATE VIEW user_rfm_segments AS
                 WITH buyer_rfm AS (
                     SELECT 
                         user_id,
-                        DATE_DIFF('day', MAX(CAST(event_time AS DATE)), CURRENT_DATE) as recency_days,
-                        COUNT(DISTINCT CAST(event_time AS DATE)) as frequency,
+                        DATE_DIFF('day', MAX(event_date), CURRENT_DATE) as recency_days,
+                        COUNT(DISTINCT event_date) as frequency,
                         SUM(price) as monetary
                     FROM events
                     WHERE event_type = 'purchase'
                     GROUP BY user_id
                 ),
+                cutoffs AS (
+                    -- Quintile cutoffs in one aggregate pass; scoring against
+                    -- the 4-value arrays replaces three NTILE windows that
+                    -- each forced a global sort of buyer_rfm
+                    SELECT
+                        approx_quantile(recency_days, [0.2, 0.4, 0.6, 0.8]) as rq,
+                        approx_quantile(frequency, [0.2, 0.4, 0.6, 0.8]) as fq,
+                        approx_quantile(monetary, [0.2, 0.4, 0.6, 0.8]) as mq
+                    FROM buyer_rfm
+                ),
                 rfm_scores AS (
-                    SELECT 
+                    SELECT
                         user_id,
                         recency_days,
                         frequency,
                         monetary,
-                        NTILE(5) OVER (ORDER BY recency_days DESC) as r_score,
-                        NTILE(5) OVER (ORDER BY frequency ASC) as f_score,
-                        NTILE(5) OVER (ORDER BY monetary ASC) as m_score
-                    FROM buyer_rfm
+                        1 + len(list_filter(c.rq, x -> x > recency_days)) as r_score,
+                        1 + len(list_filter(c.fq, x -> x < frequency)) as f_score,
+                        1 + len(list_filter(c.mq, x -> x < monetary)) as m_score
+                    FROM buyer_rfm, cutoffs c
                 )
                 SELECT 
                     user_id,
@@ -152,54 +339,135 @@ def get_connection():
             """)
             
             # Create predictions_product_affinity (for ML Engine page)
-            # Market basket analysis - which products are purchased together
+            # Market basket analysis - which products are purchased together.
+            # Pairs are generated from per-session LIST baskets instead of a
+            # quadratic events self-join, so the hash join only ever sees one
+            # row per session
             con.execute("""
-                CREATE TABLE predictions_product_affinity AS
-                WITH purchase_pairs AS (
-                    SELECT 
-                        e1.product_id as product_a,
-                        e2.product_id as product_b,
-                        e1.user_session
-                    FROM events e1
-                    JOIN events e2 
-                        ON e1.user_session = e2.user_session 
-                        AND e1.product_id < e2.product_id
-                    WHERE e1.event_type = 'purchase' 
-                        AND e2.event_type = 'purchase'
-                        AND e1.product_id IS NOT NULL 
-                        AND e2.product_id IS NOT NULL
+                CREATE VIEW predictions_product_affinity AS
+                WITH frequent_products AS (
+                    -- Apriori L1 prune on a cheap upper bound: a product
+                    -- purchased fewer than 3 times total cannot appear in
+                    -- 3 distinct sessions, so the long tail exits before
+                    -- baskets are built - no distinct hashing needed
+                    SELECT product_id
+                    FROM events
+                    WHERE event_type = 'purchase' AND product_id IS NOT NULL
+                    GROUP BY product_id
+                    HAVING COUNT(*) >= 3
+                ),
+                session_baskets AS (
+                    SELECT
+                        user_session,
+                        list_sort(LIST(DISTINCT product_id)) as items
+                    FROM events
+                    WHERE event_type = 'purchase'
+                        AND product_id IN (SELECT product_id FROM frequent_products)
+                    GROUP BY user_session
+                    HAVING len(items) BETWEEN 2 AND 50
+                ),
+                exploded AS (
+                    SELECT user_session, unnest(items) as product_id
+                    FROM session_baskets
+                ),
+                purchase_pairs AS (
+                    -- Self-join over the exploded baskets, not raw events:
+                    -- one deduped row per (session, product) goes into the
+                    -- join, and a < b emits each pair exactly once. DuckDB
+                    -- 0.10 rejects lateral column parameters in table
+                    -- functions, so index-range expansion is not available.
+                    SELECT
+                        a.product_id as product_a,
+                        b.product_id as product_b,
+                        a.user_session
+                    FROM exploded a
+                    JOIN exploded b
+                        ON a.user_session = b.user_session
+                        AND a.product_id < b.product_id
                 ),
                 pair_stats AS (
-                    SELECT 
+                    SELECT
                         product_a,
                         product_b,
-                        COUNT(DISTINCT user_session) as pair_count
+                        COUNT(*) as pair_count
                     FROM purchase_pairs
                     GROUP BY product_a, product_b
-                    HAVING COUNT(DISTINCT user_session) >= 3
+                    HAVING COUNT(*) >= 3
                 ),
                 product_support AS (
-                    SELECT 
+                    -- HLL sketch instead of an exact distinct hash set per
+                    -- product: 1-2% error is irrelevant for ranking by
+                    -- lift/confidence, while pair_stats stays exact because
+                    -- its HAVING >= 3 threshold is precision-sensitive
+                    SELECT
                         product_id,
-                        COUNT(DISTINCT user_session) as product_count
+                        approx_count_distinct(user_session) as product_count
                     FROM events
                     WHERE event_type = 'purchase' AND product_id IS NOT NULL
                     GROUP BY product_id
+                ),
+                total_purchase_sessions AS (
+                    SELECT approx_count_distinct(user_session) as n
+                    FROM events
+                    WHERE event_type = 'purchase'
                 )
-                SELECT 
+                SELECT
                     ps.product_a,
                     ps.product_b,
                     ps.pair_count,
                     CAST(ps.pair_count AS FLOAT) / NULLIF(pa.product_count, 0) as confidence,
-                    (CAST(ps.pair_count AS FLOAT) / NULLIF(pa.product_count, 0)) / 
-                        (CAST(pb.product_count AS FLOAT) / NULLIF((SELECT COUNT(DISTINCT user_session) FROM events WHERE event_type = 'purchase'), 0)) 
+                    (CAST(ps.pair_count AS FLOAT) / NULLIF(pa.product_count, 0)) /
+                        (CAST(pb.product_count AS FLOAT) / NULLIF(t.n, 0))
                         as lift
                 FROM pair_stats ps
                 JOIN product_support pa ON ps.product_a = pa.product_id
                 JOIN product_support pb ON ps.product_b = pb.product_id
-                WHERE ps.pair_count >= 3
+                CROSS JOIN total_purchase_sessions t
+                WHERE lift > 1.0
                 ORDER BY lift DESC
             """)
+
+            # Pre-joined rules + product attributes for the ML Engine page,
+            # mirroring the table the cloud builder materializes - kept as
+            # a view here since the sample rule set is small
+            con.execute("""
+                CREATE VIEW predictions_affinity_enriched AS
+                SELECT
+                    r.product_a,
+                    pa.brand as brand_a,
+                    pa.category_code as category_code_a,
+                    r.product_b,
+                    pb.brand as brand_b,
+                    pb.category_code as category_code_b,
+                    pb.current_price as current_price_b,
+                    r.pair_count,
+                    r.confidence,
+                    r.lift
+                FROM predictions_product_affinity r
+                JOIN dim_products pa ON r.product_a = pa.product_id
+                JOIN dim_products pb ON r.product_b = pb.product_id
+            """)
+
+            # Top-6 partners per product, same shape as the cloud
+            # builder's top_recommendations table
+            con.execute("""
+                CREATE VIEW top_recommendations AS
+                SELECT
+                    product_a,
+                    product_b,
+                    brand_b,
+                    category_code_b,
+                    current_price_b,
+                    pair_count,
+                    confidence,
+                    lift
+                FROM (
+                    SELECT *,
+                        ROW_NUMBER() OVER (PARTITION BY product_a ORDER BY lift DESC) as rn
+                    FROM predictions_affinity_enriched
+                )
+                WHERE rn <= 6
+            """)
             
             return con
             
@@ -211,16 +479,147 @@ def get_connection():
         # Local mode - use existing full database
         try:
             con = duckdb.connect(DB_PATH, read_only=True)
-            con.execute("SET memory_limit='8GB';")
-            con.execute("SET threads TO 4;")
+            _configure_connection(con, default_memory_gb=8)
+            # Keep parsed parquet footers/zonemaps across the small
+            # repeated dashboard queries, same as the sample-mode paths
+            con.execute("PRAGMA enable_object_cache;")
             return con
         except Exception as e:
             st.error(f"❌ Database connection error: {e}")
             st.stop()
 
-def run_query(query):
+def get_connection():
+    """Get a cursor onto the shared database.
+
+    cache_resource holds the database itself; each caller gets its own
+    cursor so concurrent Streamlit sessions never execute on the same
+    DuckDB connection object from different threads.
+    """
+    return _db().cursor()
+
+# Process-wide query-result cache, shared across Streamlit sessions.
+# st.cache_data is managed per Streamlit cache context; this layer lets
+# concurrent dashboard users reuse each other's identical queries.
+_RESULT_CACHE = OrderedDict()  # sha256(query) -> (timestamp, DataFrame)
+_RESULT_CACHE_LOCK = threading.Lock()
+_RESULT_CACHE_TTL = 600   # seconds
+_RESULT_CACHE_MAX = 64    # entries (LRU-evicted beyond this)
+_RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # never pin results bigger than this
+
+def _pandas_types_mapper(pa_type):
+    """types_mapper for Arrow->pandas keeping strings Arrow-backed.
+
+    Temporal columns fall through to the default numpy conversion
+    (datetime64[ns] with date_as_object=False): plotly 5.19 cannot
+    handle Arrow date32 columns in px charts, and the zero-copy win is
+    in the string columns anyway.
+    """
+    if pa.types.is_temporal(pa_type):
+        return None
+    return pd.ArrowDtype(pa_type)
+
+def run_query(query, params=None):
+    key = hashlib.sha256(f"{query}|{params!r}".encode()).hexdigest()
+    with _RESULT_CACHE_LOCK:
+        cached = _RESULT_CACHE.get(key)
+        if cached is not None:
+            ts, df = cached
+            if time.time() - ts < _RESULT_CACHE_TTL:
+                _RESULT_CACHE.move_to_end(key)
+                return df.copy()
+            del _RESULT_CACHE[key]
+
+    # Arrow transfer out of DuckDB, kept on Arrow-backed dtypes: string
+    # columns stay in Arrow buffers instead of numpy object arrays, and
+    # Streamlit's serializer ships them to the frontend without
+    # re-encoding (temporal columns convert to datetime64 for plotly).
+    # Bound parameters keep the SQL text constant across widget states:
+    # DuckDB reuses the compiled plan instead of re-parsing a new string
+    # variant, and values are bound rather than interpolated
+    con = get_connection()
+    result = con.execute(query, params) if params else con.execute(query)
+    table = result.fetch_arrow_table()
+    df = table.to_pandas(types_mapper=_pandas_types_mapper, date_as_object=False)
+
+    # Oversized results are returned uncached: pinning them would eat into
+    # the ~1GB Streamlit Cloud budget for the lifetime of the TTL
+    if table.nbytes > _RESULT_CACHE_MAX_BYTES:
+        return df
+
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = (time.time(), df)
+        while len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+            _RESULT_CACHE.popitem(last=False)
+    # Copies keep cached frames safe from caller mutation
+    return df.copy()
+
+# Named parameterized queries. Pages pass (name, params) instead of
+# interpolating values into SQL text: DuckDB binds the values rather than
+# planning a new string variant per widget state, and the cache key
+# becomes a stable (name, params) tuple.
+PREPARED_QUERIES = {
+    "revenue_trend": "SELECT date, daily_revenue, dau FROM fact_daily_kpis ORDER BY date",
+}
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def run_prepared(name: str, *params) -> pd.DataFrame:
+    """Run a named query from PREPARED_QUERIES with bound parameters"""
+    sql = PREPARED_QUERIES[name]
     con = get_connection()
-    return con.execute(query).fetchdf()
+    result = con.execute(sql, list(params)) if params else con.execute(sql)
+    return result.fetch_arrow_table().to_pandas()
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def run_query_cached(query: str) -> pd.DataFrame:
+    """Cached variant of run_query for hot dashboard queries.
+
+    Repeated widget interactions hit the in-memory cached result instead of
+    round-tripping through DuckDB on every rerun. Only the DataFrame is
+    cached - the connection itself stays under st.cache_resource, since
+    DuckDB objects must never be returned from cache_data. String columns
+    keep Arrow-backed dtypes so cached frames stay compact and serialize
+    to the frontend without re-encoding; temporal columns convert to
+    datetime64 for plotly.
+    """
+    table = get_connection().execute(query).fetch_arrow_table()
+    return table.to_pandas(types_mapper=_pandas_types_mapper, date_as_object=False)
+
+def run_scalar(query):
+    """Run a scalar/aggregate query and return the raw result tuple.
+
+    Skips the Arrow->pandas conversion that fetchdf() pays — for 1-row
+    results the DataFrame build is pure overhead.
+    """
+    return get_connection().execute(query).fetchone()
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def run_scalar_cached(query: str):
+    """Cached variant of run_scalar for per-page KPI lookups.
+
+    Reruns triggered by widget interaction read the tuple from cache
+    instead of re-executing the aggregate.
+    """
+    return get_connection().execute(query).fetchone()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_hero_stats():
+    """Fetch all Home-page hero scalars in a single DuckDB round-trip.
+
+    One query with scalar subqueries replaces 4+ separate execute/fetchdf
+    calls, and fetchone() skips the pandas DataFrame build entirely.
+    Returns (events, users, buyers, sessions, revenue, conversion_rate).
+    """
+    sql = """
+        SELECT
+            (SELECT COUNT(*) FROM events) AS events,
+            (SELECT COUNT(*) FROM dim_users) AS users,
+            (SELECT SUM(is_buyer) FROM dim_users) AS buyers,
+            (SELECT COUNT(*) FROM fact_sessions) AS sessions,
+            (SELECT SUM(daily_revenue) FROM fact_daily_kpis) AS revenue,
+            (SELECT COUNT(*) FILTER (WHERE is_buyer = 1) * 100.0 / COUNT(*)
+             FROM dim_users) AS conversion_rate
+    """
+    return get_connection().execute(sql).fetchone()
 
 def format_currency(val):
     return f"${val:,.0f}"
@@ -235,13 +634,14 @@ def format_number(val):
 
 def is_sample_mode():
     """Check if running in sample data mode"""
-    return SAMPLE_MODE or IS_CLOUD
+    mode = _detect_mode()
+    return mode['sample_mode'] or mode['is_cloud']
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_dataset_info():
-    """Get information about the current dataset"""
+    """Get information about the current dataset (cached - fires on every page)"""
     try:
-        con = get_connection()
-        event_count = con.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        event_count = run_scalar("SELECT COUNT(*) FROM events")[0]
         
         is_sample = is_sample_mode()
         
@@ -249,7 +649,7 @@ def get_dataset_info():
             return {
                 'event_count': event_count,
                 'is_sample': True,
-                'mode': 'Cloud Sample' if IS_CLOUD else 'Sample',
+                'mode': 'Cloud Sample' if _detect_mode()['is_cloud'] else 'Sample',
                 'notice': '🌐 Cloud Demo Mode - Using representative sample',
                 'display_text': f'{event_count:,} events (sample dataset)'
             }
@@ -261,7 +661,9 @@ def get_dataset_info():
                 'notice': '🖥️ Local Mode - Using complete dataset',
                 'display_text': f'{event_count:,} events (full dataset)'
             }
-    except Exception as e:
+    except duckdb.Error:
+        # Only database failures get the fallback; anything else should
+        # surface through Streamlit's normal error reporting
         return {
             'event_count': 0,
             'is_sample': True,
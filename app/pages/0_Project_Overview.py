@@ -1,8 +1,9 @@
 import streamlit as st
 import plotly.graph_objects as go
-from db_utils import run_query
+from db_utils import run_query, run_scalar, format_number
 import sys
 import os
+from pathlib import Path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'components'))
 from glossary import show_glossary
 
@@ -21,9 +22,15 @@ found in FAANG companies.
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
+    # ~60 pre-aggregated rows answer this instead of a scan over events
+    try:
+        total_events = run_scalar("SELECT SUM(daily_events) FROM fact_daily_kpis")[0]
+        events_display = format_number(total_events)
+    except Exception:
+        events_display = "109M"
     st.metric(
         "Events Processed",
-        "109M",
+        events_display,
         help="Total behavioral events from Oct-Nov 2019"
     )
 
@@ -117,12 +124,12 @@ The platform follows a modern data science pipeline with optimization at every l
 - **Preprocessing Strategy:** Clever sampling and optimization techniques applied in the [`summarise`](https://github.com/BhargavKumarNath/Customer-Intelligence-Platform/tree/main/summarise) folder reduce the dataset to a manageable size while preserving statistical properties
 """)
 
-# Display the SVG diagram
-import os
-svg_path = "system_design.svg"
+# Display the SVG diagram - resolve against the repo root so the check
+# doesn't depend on the working directory Streamlit was launched from
+svg_path = Path(__file__).resolve().parents[2] / "system_design.svg"
 
-if os.path.exists(svg_path):
-    st.image(svg_path, width='stretch', caption="End-to-End System Architecture")
+if svg_path.is_file():
+    st.image(str(svg_path), width='stretch', caption="End-to-End System Architecture")
 else:
     # Fallback to simplified text description if SVG not found
     st.info("""
@@ -207,8 +214,8 @@ with tab1:
         ]
     }
     
-    import pandas as pd
-    st.table(pd.DataFrame(optimization_data))
+    # st.table takes the dict-of-lists directly - no pandas build per rerun
+    st.table(optimization_data)
     
     show_glossary("Categorical Encoding")
     show_glossary("DuckDB")
@@ -304,8 +311,7 @@ tech_stack = {
     ]
 }
 
-import pandas as pd
-st.dataframe(pd.DataFrame(tech_stack), width='stretch', hide_index=True)
+st.dataframe(tech_stack, width='stretch', hide_index=True)
 
 st.markdown("---")
 
@@ -343,7 +349,7 @@ pages_info = {
     ]
 }
 
-st.dataframe(pd.DataFrame(pages_info), width='stretch', hide_index=True)
+st.dataframe(pages_info, width='stretch', hide_index=True)
 
 st.markdown("---")
 
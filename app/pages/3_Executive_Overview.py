@@ -1,7 +1,7 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from db_utils import run_query, format_currency, format_number
+from db_utils import run_query_cached, run_prepared, run_scalar_cached, format_currency, format_number
 
 st.set_page_config(page_title="Executive Overview", page_icon="📈", layout="wide")
 
@@ -32,7 +32,9 @@ st.markdown("---")
 
 
 # 1. TOP LEVEL METRICS (KPI Cards)
-df_kpi = run_query("""
+# run_scalar_cached returns plain tuples - no pandas DataFrame for one-row
+# results - and reruns hit the st.cache_data entry instead of DuckDB
+total_rev, total_orders, aov = run_scalar_cached("""
     SELECT 
         SUM(daily_revenue) as total_rev,
         SUM(purchases) as total_orders,
@@ -43,24 +45,23 @@ df_kpi = run_query("""
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Revenue", format_currency(df_kpi['total_rev'][0]))
+    st.metric("Total Revenue", format_currency(total_rev))
 with col2:
-    st.metric("Total Orders", format_number(df_kpi['total_orders'][0]))
+    st.metric("Total Orders", format_number(total_orders))
 with col3:
-    st.metric("Avg Order Value", format_currency(df_kpi['aov'][0]))
+    st.metric("Avg Order Value", format_currency(aov))
 with col4:
     # Get overall conversion from the sessions table
-    df_conv = run_query("""
+    conversion = run_scalar_cached("""
         SELECT SUM(CAST(has_purchase AS INT)) / CAST(COUNT(*) AS DOUBLE) as conversion 
         FROM fact_sessions
-    """)
-    conversion = df_conv['conversion'][0]
+    """)[0]
     st.metric("Conversion Rate", f"{conversion:.2%}")
 
 # 2. REVENUE TREND (Time Series)
 st.subheader("Revenue & Traffic Trends")
 
-df_trend = run_query("SELECT date, daily_revenue, dau FROM fact_daily_kpis ORDER BY date")
+df_trend = run_prepared("revenue_trend")
 
 tab1, tab2 = st.tabs(["Revenue", "Active Users"])
 
@@ -77,18 +78,14 @@ with tab2:
 # 3. CONVERSION FUNNEL
 st.subheader("Conversion Funnel Health")
 
-# Fetch funnel data from events aggregated by session
-df_funnel = run_query("""
-    SELECT 
-        COUNT(DISTINCT CASE WHEN event_type = 'view' THEN user_session END) as Views,
-        COUNT(DISTINCT CASE WHEN event_type = 'cart' THEN user_session END) as Carts,
-        COUNT(DISTINCT CASE WHEN event_type = 'purchase' THEN user_session END) as Purchases
-    FROM events
-""")
+# The per-stage session counts are pre-aggregated into fact_funnel at
+# build time (3 rows) - no distinct-count over raw events at page load
+df_funnel = run_query_cached("SELECT event_type, sessions FROM fact_funnel")
+funnel_counts = dict(zip(df_funnel['event_type'], df_funnel['sessions']))
 
 # Prepare data for Plotly Funnel
 stages = ['Sessions with View', 'Sessions with Cart', 'Sessions with Purchase']
-values = [df_funnel['Views'][0], df_funnel['Carts'][0], df_funnel['Purchases'][0]]
+values = [funnel_counts.get(et, 0) for et in ('view', 'cart', 'purchase')]
 
 fig_funnel = go.Figure(go.Funnel(
     y=stages,
@@ -113,7 +110,7 @@ with col1:
     - {total_rev} in tracked revenue
     - Growth opportunities through ML-driven targeting
     - High-value segments identified for personalization
-    """.format(total_rev=format_currency(df_kpi['total_rev'][0])))
+    """.format(total_rev=format_currency(total_rev)))
 
 with col2:
     st.info("""
@@ -2,7 +2,7 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from db_utils import run_query, format_currency
+from db_utils import run_query_cached, format_currency
 
 st.set_page_config(page_title="User Intelligence", page_icon="👥", layout="wide")
 
@@ -36,8 +36,12 @@ st.markdown("---")
 st.header("1. Behavioral Segmentation (RFM)")
 
 
-# Load RFM Data (Sampled for performance if needed, but 700k fits in memory for plotting)
-df_rfm = run_query("""
+# Load RFM Data, sampled down for smooth scatter plots. reservoir is a
+# single streaming pass (the default Bernoulli sampler reads the input
+# twice to hit an exact row count), and REPEATABLE pins the seed so the
+# sample - and therefore the st.cache_data key's result - is stable
+# across reruns. 10K points is visually identical to the full set.
+df_rfm = run_query_cached("""
     SELECT 
         segment,
         recency_days,
@@ -45,15 +49,16 @@ df_rfm = run_query("""
         monetary,
         CAST(r_score AS VARCHAR) || CAST(f_score AS VARCHAR) || CAST(m_score AS VARCHAR) as rfm_code
     FROM user_rfm_segments
-    -- Sample down for smoother scatter plots if > 50k points
-    USING SAMPLE 10000 
+    USING SAMPLE reservoir(10000 ROWS) REPEATABLE (42)
 """)
 
 col1, col2 = st.columns([3, 1])
 
 with col1:
     st.subheader("Segment Landscape")
-    # Interactive Scatter Plot
+    # Interactive Scatter Plot. WebGL keeps the 10K sampled points off
+    # the SVG DOM - Scattergl renders them on the GPU and stays smooth
+    # even if the sample cap is raised later.
     fig_rfm = px.scatter(
         df_rfm,
         x='recency_days',
@@ -64,7 +69,8 @@ with col1:
         hover_data=['rfm_code'],
         title="RFM Map: Recency vs. Spend (Log Scale)",
         labels={'recency_days': 'Days Since Last Order', 'monetary': 'Total Lifetime Spend ($)'},
-        color_discrete_sequence=px.colors.qualitative.Bold
+        color_discrete_sequence=px.colors.qualitative.Bold,
+        render_mode='webgl'
     )
     fig_rfm.update_layout(height=500)
     st.plotly_chart(fig_rfm, width='stretch')
@@ -82,9 +88,14 @@ with col2:
     """)
     
     
-    # Segment Counts
-    df_counts = df_rfm['segment'].value_counts().reset_index()
-    df_counts.columns = ['Segment', 'Count']
+    # Segment Counts over the full segment view, not the 10K scatter
+    # sample: DuckDB's group-by is a ~10-row result and the pie shows
+    # the true distribution instead of a sample estimate
+    df_counts = run_query_cached("""
+        SELECT segment as Segment, COUNT(*) as Count
+        FROM user_rfm_segments
+        GROUP BY segment
+    """)
     fig_pie = px.pie(df_counts, names='Segment', values='Count', hole=0.4)
     fig_pie.update_layout(height=300, showlegend=False)
     st.plotly_chart(fig_pie, width='stretch')
@@ -110,22 +121,20 @@ In **full dataset mode**, this would show:
 *This feature is available when running with the complete processed dataset.*
 """)
 
-# # Fetch Retention Data
-# df_retention = run_query("SELECT * FROM analysis_weekly_retention")
-# 
-# # Pivot for Heatmap
-# pivot_df = df_retention.pivot(index='cohort_week', columns='weeks_since_first', values='retention_rate')
-# # Sort index to ensure dates are in order
-# pivot_df = pivot_df.sort_index()
+# # Fetch the retention matrix, pre-pivoted offline by retention.py -
+# # no pandas reshape at render time
+# pivot_df = run_query_cached(
+#     "SELECT * FROM analysis_weekly_retention_wide ORDER BY cohort_week"
+# ).set_index('cohort_week')
 # 
-# # Create Heatmap
+# # Create Heatmap. texttemplate formats cell labels in plotly.js -
+# # no per-cell Python string allocation (NaN cells render empty)
 # fig_heat = go.Figure(data=go.Heatmap(
 #     z=pivot_df.values,
 #     x=pivot_df.columns,
 #     y=pivot_df.index,
 #     colorscale='Viridis',
-#     text=[[f"{val:.1%}" if pd.notnull(val) else "" for val in row] for row in pivot_df.values],
-#     texttemplate="%{text}",
+#     texttemplate="%{z:.1%}",
 #     showscale=True
 # ))
 # 
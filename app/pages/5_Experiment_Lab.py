@@ -3,8 +3,12 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import math
+
 from scipy import stats
 
+from db_utils import fragment
+
 st.set_page_config(page_title="Experiment Lab", page_icon="🧪", layout="wide")
 
 st.title("🧪 Causal Inference & Experimentation Lab")
@@ -39,80 +43,114 @@ with st.expander("🔬 Experiment Design Rationale"):
 st.markdown("---")
 
 
+@st.cache_data(show_spinner=False)
+def compute_curves(lo, hi, rate_a, se_a, rate_b, se_b):
+    """Memoized pdf curves for the distribution plot.
+
+    Pure numeric work keyed on six scalars: recomputing the linspace and
+    two norm.pdf passes is skipped whenever a rerun repeats the same
+    slider state.
+    """
+    x = np.linspace(lo, hi, 1000)
+    return x, stats.norm.pdf(x, rate_a, se_a), stats.norm.pdf(x, rate_b, se_b)
+
+
 # 1. EXPERIMENT CONFIGURATION
+# Sidebar widgets stay outside the fragment: fragments may not write to
+# containers beyond their own boundary on fragment reruns, and a slider
+# change must rerun the page anyway to feed new parameters in.
 st.sidebar.header("🔬 Experiment Parameters")
 
-# Sliders
 traffic_size = st.sidebar.slider("Sample Size (Users per variant)", 1000, 50000, 18000, step=1000)
 baseline_conv = st.sidebar.slider("Baseline Conversion Rate (%)", 1.0, 30.0, 12.0, step=0.5) / 100.0
 expected_lift = st.sidebar.slider("Expected Lift (Relative %)", 0.0, 50.0, 15.0, step=1.0) / 100.0
 confidence_level = st.sidebar.selectbox("Confidence Level", [0.90, 0.95, 0.99], index=1)
-
-# Run Simulation
-st.subheader("Real-Time Simulation Results")
-
-# Generate Synthetic Data based on sliders
-np.random.seed(42)
-control_conversions = np.random.binomial(n=traffic_size, p=baseline_conv)
-treatment_prob = baseline_conv * (1 + expected_lift)
-treatment_conversions = np.random.binomial(n=traffic_size, p=treatment_prob)
-
-# Calculate Stats
-control_rate = control_conversions / traffic_size
-treatment_rate = treatment_conversions / traffic_size
-actual_lift = (treatment_rate - control_rate) / control_rate
-
-# Z-Test
-se_control = np.sqrt(control_rate * (1 - control_rate) / traffic_size)
-se_treatment = np.sqrt(treatment_rate * (1 - treatment_rate) / traffic_size)
-se_diff = np.sqrt(se_control**2 + se_treatment**2)
-z_score = (treatment_rate - control_rate) / se_diff
-p_value = stats.norm.sf(abs(z_score)) * 2  # Two-tailed
-
-# 2. VISUALIZATION
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    # Distribution Plot
-    x = np.linspace(baseline_conv * 0.8, treatment_prob * 1.2, 1000)
-    y_control = stats.norm.pdf(x, control_rate, se_control)
-    y_treatment = stats.norm.pdf(x, treatment_rate, se_treatment)
+add_noise = st.sidebar.checkbox("Add sampling noise", value=False)
+
+
+# Fragment boundary: reruns triggered inside the simulation block stay
+# scoped to it, not the whole page (expander markdown, explanation
+# footer). No-op shim on Streamlit builds without fragments.
+@fragment
+def simulation_block():
+    # Run Simulation
+    st.subheader("Real-Time Simulation Results")
+
+    # Generate Synthetic Data based on sliders. Default path is analytic:
+    # expected counts straight from the rates - deterministic across reruns
+    # and no binomial draw. The seeded RNG path stays available for demoing
+    # sampling noise.
+    treatment_prob = baseline_conv * (1 + expected_lift)
+    if add_noise:
+        np.random.seed(42)
+        control_conversions = np.random.binomial(n=traffic_size, p=baseline_conv)
+        treatment_conversions = np.random.binomial(n=traffic_size, p=treatment_prob)
+    else:
+        control_conversions = round(traffic_size * baseline_conv)
+        treatment_conversions = round(traffic_size * treatment_prob)
+
+    # Calculate Stats
+    control_rate = control_conversions / traffic_size
+    treatment_rate = treatment_conversions / traffic_size
+    actual_lift = (treatment_rate - control_rate) / control_rate
+
+    # Z-Test
+    se_control = np.sqrt(control_rate * (1 - control_rate) / traffic_size)
+    se_treatment = np.sqrt(treatment_rate * (1 - treatment_rate) / traffic_size)
+    se_diff = np.sqrt(se_control**2 + se_treatment**2)
+    z_score = (treatment_rate - control_rate) / se_diff
+    # Two-tailed p via libm's erfc - same value as 2*norm.sf(|z|)
+    # without the SciPy dispatch per slider tick
+    p_value = math.erfc(abs(z_score) / math.sqrt(2))
+
+    # 2. VISUALIZATION
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        # Distribution Plot
+        x, y_control, y_treatment = compute_curves(
+            baseline_conv * 0.8, treatment_prob * 1.2,
+            control_rate, se_control, treatment_rate, se_treatment,
+        )
     
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x, y=y_control, name='Control Group', fill='tozeroy', line=dict(color='gray')))
-    fig.add_trace(go.Scatter(x=x, y=y_treatment, name='Treatment Group', fill='tozeroy', line=dict(color='green')))
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=x, y=y_control, name='Control Group', fill='tozeroy', line=dict(color='gray')))
+        fig.add_trace(go.Scatter(x=x, y=y_treatment, name='Treatment Group', fill='tozeroy', line=dict(color='green')))
     
-    fig.update_layout(
-        title="Probability Distributions of Conversion Rates",
-        xaxis_title="Conversion Rate",
-        yaxis_title="Density",
-        height=400
-    )
-    st.plotly_chart(fig, width='stretch')
-
-with col2:
-    st.write("### Statistical Report")
+        fig.update_layout(
+            title="Probability Distributions of Conversion Rates",
+            xaxis_title="Conversion Rate",
+            yaxis_title="Density",
+            height=400
+        )
+        st.plotly_chart(fig, width='stretch')
+
+    with col2:
+        st.write("### Statistical Report")
     
-    # Metric Cards
-    c1, c2 = st.columns(2)
-    c1.metric("Control Rate", f"{control_rate:.2%}")
-    c2.metric("Treatment Rate", f"{treatment_rate:.2%}")
-    st.metric("Observed Lift", f"{actual_lift:.2%}", delta_color="normal")
+        # Metric Cards
+        c1, c2 = st.columns(2)
+        c1.metric("Control Rate", f"{control_rate:.2%}")
+        c2.metric("Treatment Rate", f"{treatment_rate:.2%}")
+        st.metric("Observed Lift", f"{actual_lift:.2%}", delta_color="normal")
     
-    st.divider()
+        st.divider()
     
-    # Significance Decision
-    alpha = 1 - confidence_level
-    is_sig = p_value < alpha
+        # Significance Decision
+        alpha = 1 - confidence_level
+        is_sig = p_value < alpha
     
-    if is_sig:
-        st.success(f"✅ **Statistically Significant**")
-        st.write(f"P-Value: `{p_value:.5f}`")
-        st.write(f"We are {confidence_level:.0%} confident this lift is real.")
-    else:
-        st.error(f"❌ **Not Significant**")
-        st.write(f"P-Value: `{p_value:.5f}`")
-        st.write("The difference could be due to random noise. Need more sample size.")
+        if is_sig:
+            st.success(f"✅ **Statistically Significant**")
+            st.write(f"P-Value: `{p_value:.5f}`")
+            st.write(f"We are {confidence_level:.0%} confident this lift is real.")
+        else:
+            st.error(f"❌ **Not Significant**")
+            st.write(f"P-Value: `{p_value:.5f}`")
+            st.write("The difference could be due to random noise. Need more sample size.")
+
+
+simulation_block()
 
 # 3. EXPLANATION
 st.info("""
@@ -0,0 +1,166 @@
+"""
+Sample Derived-Table Builder
+
+Pre-materializes the derived tables the dashboard needs (dim_products,
+fact_daily_kpis, fact_sessions, dim_users) from the sample parquet and
+writes them to data/sample/derived/ as ZSTD parquet.
+
+app/db_utils.py looks for these snapshots at connection time: when they
+exist, a Streamlit cold start loads four small parquet files instead of
+re-aggregating the events table. Run this once after regenerating the
+sample dataset and commit the outputs.
+"""
+
+import duckdb
+import logging
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent.parent
+SAMPLE_PARQUET = PROJECT_ROOT / "data" / "sample" / "sample_optimized.parquet"
+DERIVED_DIR = PROJECT_ROOT / "data" / "sample" / "derived"
+
+# Same SQL as app/db_utils.py builds at connection time - keep in sync
+DERIVED_TABLES = {
+    "dim_products": """
+        SELECT
+            product_id,
+            arg_max(category_id, event_time) as category_id,
+            COALESCE(arg_max(category_code, event_time), 'unknown') as category_code,
+            COALESCE(arg_max(brand, event_time), 'unknown') as brand,
+            arg_max(price, event_time) as current_price
+        FROM events
+        WHERE product_id IS NOT NULL
+        GROUP BY product_id
+    """,
+    "fact_daily_kpis": """
+        SELECT
+            event_date as date,
+            COUNT(*) as daily_events,
+            approx_count_distinct(user_id) as dau,
+            approx_count_distinct(user_session) as daily_sessions,
+            COUNT(*) FILTER (WHERE event_type = 'view') as views,
+            COUNT(*) FILTER (WHERE event_type = 'cart') as carts,
+            COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases,
+            COALESCE(SUM(price) FILTER (WHERE event_type = 'purchase'), 0) as daily_revenue,
+            approx_count_distinct(user_id) FILTER (WHERE event_type = 'purchase') as unique_buyers
+        FROM events
+        GROUP BY event_date
+        ORDER BY date
+    """,
+    "fact_sessions": """
+        SELECT
+            user_session,
+            user_id,
+            MIN(event_time) as session_start,
+            MAX(event_time) as session_end,
+            CAST(EXTRACT(EPOCH FROM (MAX(event_time) - MIN(event_time))) AS INTEGER) as duration_sec,
+            COUNT(*) as event_count,
+            COUNT(DISTINCT product_id) as unique_products,
+            MAX(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as has_purchase,
+            COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases,
+            COALESCE(SUM(price) FILTER (WHERE event_type = 'purchase'), 0) as session_revenue
+        FROM events
+        GROUP BY user_session, user_id
+    """,
+    # Built last: re-aggregates fact_sessions instead of scanning events
+    "dim_users": """
+        SELECT
+            user_id,
+            MIN(session_start) as first_seen,
+            MAX(session_end) as last_seen,
+            SUM(event_count) as event_count,
+            COUNT(*) as session_count,
+            SUM(purchases) as purchase_count,
+            SUM(session_revenue) as total_spend,
+            MAX(has_purchase) as is_buyer
+        FROM fact_sessions
+        GROUP BY user_id
+    """,
+    "mv_top_categories": """
+        SELECT
+            COALESCE(category_code, 'unknown') as category,
+            COUNT(*) as events,
+            COUNT(DISTINCT user_id) as users,
+            COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases
+        FROM events
+        GROUP BY category_code
+        ORDER BY events DESC
+        LIMIT 15
+    """,
+    "fact_funnel": """
+        SELECT
+            event_type,
+            COUNT(DISTINCT user_session) as sessions
+        FROM events
+        WHERE event_type IN ('view', 'cart', 'purchase')
+        GROUP BY event_type
+    """,
+    "mv_top_brands": """
+        SELECT
+            COALESCE(brand, 'unknown') as brand,
+            COUNT(*) as events,
+            COUNT(DISTINCT user_id) as users,
+            COUNT(*) FILTER (WHERE event_type = 'purchase') as purchases
+        FROM events
+        GROUP BY events.brand
+        ORDER BY events DESC
+        LIMIT 15
+    """,
+}
+
+
+def build_sample_tables():
+    """Materialize the derived tables and snapshot them to parquet"""
+
+    if not SAMPLE_PARQUET.exists():
+        logger.error(f"Sample parquet not found: {SAMPLE_PARQUET}")
+        logger.error("Run create_sample_dataset.py first!")
+        return
+
+    DERIVED_DIR.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Building derived tables from: {SAMPLE_PARQUET}")
+
+    con = duckdb.connect(':memory:')
+
+    try:
+        con.execute(f"""
+            CREATE TABLE events AS
+            SELECT
+                event_time,
+                event_type,
+                product_id,
+                category_id,
+                category_code,
+                brand,
+                price,
+                user_id,
+                user_session,
+                CAST(event_time AS DATE) AS event_date
+            FROM read_parquet('{SAMPLE_PARQUET.as_posix()}')
+        """)
+
+        for name, sql in DERIVED_TABLES.items():
+            out_path = DERIVED_DIR / f"{name}.parquet"
+            con.execute(f"CREATE TABLE {name} AS {sql}")
+            con.execute(f"COPY {name} TO '{out_path.as_posix()}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+
+            rows = con.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            size_mb = out_path.stat().st_size / (1024 * 1024)
+            logger.info(f"  {name:20s} {rows:>10,} rows  {size_mb:6.2f} MB")
+
+        logger.info(f"✅ Derived tables written to: {DERIVED_DIR}")
+
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    build_sample_tables()
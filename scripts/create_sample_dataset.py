@@ -59,46 +59,24 @@ def create_sample_dataset():
         # Strategy: Sample by day to ensure temporal coverage, then sample events within each day
         logger.info(f"Creating {SAMPLE_PERCENTAGE}% stratified sample...")
         
+        # Deterministic hash split on user_id: one GROUP BY instead of the
+        # previous double NTILE + ORDER BY RANDOM() pipeline, which sorted
+        # the full user table twice and then thinned events with an extra
+        # RANDOM() pass. A uniform hash samples every activity stratum at
+        # the same rate (so the light/heavy-user mix is preserved without
+        # quintile bookkeeping), keeps each sampled user's history intact,
+        # and is reproducible via RANDOM_SEED in the hash input.
         sample_query = f"""
         CREATE OR REPLACE TEMP TABLE sample_events AS
         SELECT *
         FROM events
         WHERE user_id IN (
-            -- Sample users stratified by their activity level
             SELECT user_id
-            FROM (
-                SELECT 
-                    user_id,
-                    COUNT(*) as event_count,
-                    NTILE(5) OVER (ORDER BY COUNT(*)) as activity_quintile
-                FROM events
-                GROUP BY user_id
-            ) user_stats
-            -- Sample from each quintile to preserve user behavior distribution
-            WHERE user_id IN (
-                SELECT user_id
-                FROM (
-                    SELECT 
-                        user_id,
-                        activity_quintile,
-                        ROW_NUMBER() OVER (PARTITION BY activity_quintile ORDER BY RANDOM()) as rn,
-                        COUNT(*) OVER (PARTITION BY activity_quintile) as quintile_size
-                    FROM (
-                        SELECT 
-                            user_id,
-                            COUNT(*) as event_count,
-                            NTILE(5) OVER (ORDER BY COUNT(*)) as activity_quintile
-                        FROM events
-                        GROUP BY user_id
-                    )
-                )
-                WHERE rn <= (quintile_size * {SAMPLE_PERCENTAGE / 100.0})
-            )
+            FROM (SELECT DISTINCT user_id FROM events)
+            WHERE (hash(user_id + {RANDOM_SEED}) % 10000) < {int(SAMPLE_PERCENTAGE * 100)}
         )
-        AND RANDOM() < 0.5  -- Additional sampling to fine-tune final size
         """
-        
-        # DuckDB 0.10+ doesn't support SET random_seed, RANDOM() provides sufficient randomness
+
         con.execute(sample_query)
         
         # Check sample size
@@ -144,9 +122,28 @@ def create_sample_dataset():
         logger.info(f"Exporting sample to: {OUTPUT_PARQUET}")
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         
+        # Downcast at export (UInt32 ids, Float32 price) and order rows by
+        # (day, user) with ~100K-row groups: row-group min/max statistics
+        # then let DuckDB skip whole groups for both date-range and
+        # per-user predicates. String columns get parquet dictionary
+        # encoding automatically, which is what carries the big win on
+        # brand/category_code/event_type.
         con.execute(f"""
-            COPY sample_events TO '{str(OUTPUT_PARQUET)}' 
-            (FORMAT PARQUET, COMPRESSION ZSTD, COMPRESSION_LEVEL 3)
+            COPY (
+                SELECT
+                    event_time,
+                    event_type,
+                    CAST(product_id AS UINTEGER) as product_id,
+                    category_id,
+                    category_code,
+                    brand,
+                    CAST(price AS FLOAT) as price,
+                    CAST(user_id AS UINTEGER) as user_id,
+                    user_session
+                FROM sample_events
+                ORDER BY CAST(event_time AS DATE), user_id, event_time
+            ) TO '{str(OUTPUT_PARQUET)}' 
+            (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 100000)
         """)
         
         # Get file size
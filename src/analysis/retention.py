@@ -28,17 +28,20 @@ def calculate_retention(cfg: DictConfig):
         query_retention = """
         CREATE OR REPLACE TABLE analysis_weekly_retention AS
         WITH user_activity AS (
+            -- DATE (4 bytes), not the TIMESTAMP date_trunc returns: the
+            -- cohort keys are daily-granular, and the narrower key halves
+            -- the column through the join/group stages and in the table
             SELECT 
                 u.user_id,
-                date_trunc('week', u.first_seen) as cohort_week,
-                date_trunc('week', e.event_time) as activity_week
+                CAST(date_trunc('week', u.first_seen) AS DATE) as cohort_week,
+                CAST(date_trunc('week', e.event_time) AS DATE) as activity_week
             FROM dim_users u
             JOIN events e ON u.user_id = e.user_id
         ),
         cohort_sizes AS (
             -- Get the starting size of each cohort (Week 0)
             SELECT 
-                date_trunc('week', first_seen) as cohort_week,
+                CAST(date_trunc('week', first_seen) AS DATE) as cohort_week,
                 COUNT(DISTINCT user_id) as cohort_size
             FROM dim_users
             GROUP BY 1
@@ -60,6 +63,18 @@ def calculate_retention(cfg: DictConfig):
         con.execute(query_retention)
         logger.info(f"Retention table build in {time.time() - start:.2f}s")
 
+        # 1b. Pre-pivot the matrix the dashboard heatmap needs, so the page
+        # reads a wide table as-is instead of reshaping in pandas per render
+        query_pivot = """
+        CREATE OR REPLACE TABLE analysis_weekly_retention_wide AS
+        PIVOT analysis_weekly_retention 
+        ON weeks_since_first 
+        USING first(retention_rate) 
+        GROUP BY cohort_week;
+        """
+        con.execute(query_pivot)
+        logger.info("Wide retention matrix (analysis_weekly_retention_wide) created")
+
         # 2. Compute Churn Risk
         logger.info("Identidying At-Risk Users...")
 
@@ -84,11 +99,10 @@ def calculate_retention(cfg: DictConfig):
         # 3. VERIFICATION & PREVIEW
         logger.info("Retention Matrix Preview (Pandas formatted):")
         
-        # Fetch data to display a nice pivot table in the logs
-        df = con.execute("SELECT * FROM analysis_weekly_retention").fetchdf()
-        
-        # Pivot for readability: Rows=Cohort, Cols=Weeks Out, Val=Retention Rate
-        pivot = df.pivot(index='cohort_week', columns='weeks_since_first', values='retention_rate')
+        # The wide table is already pivoted: Rows=Cohort, Cols=Weeks Out
+        pivot = con.execute(
+            "SELECT * FROM analysis_weekly_retention_wide ORDER BY cohort_week"
+        ).fetchdf().set_index('cohort_week')
         print(pivot.round(3).fillna(''))
 
         # Churn Stats
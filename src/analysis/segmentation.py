@@ -46,27 +46,41 @@ def perform_segmentation(cfg: DictConfig):
         # Frequency/Monetary: Higher is better (1=Low, 5=High)
         
         logger.info("   Computing NTILE quantiles (1-5)...")
+        # Narrow types for the hot columns: scores fit TINYINT, the packed
+        # rfm_code fits SMALLINT (111-555), recency fits SMALLINT, and the
+        # 8 segment labels become a 1-byte ENUM dictionary instead of
+        # repeated varchars. The dashboard scatter streams this table, so
+        # every byte per row shows up in scan time.
+        con.execute("DROP TYPE IF EXISTS segment_label;")
+        con.execute("""
+            CREATE TYPE segment_label AS ENUM (
+                'Champions', 'Loyal Customers', 'New Customers', 'Promising',
+                'Need Attention', 'Cant Lose Them', 'Hibernating', 'At Risk'
+            );
+        """)
         query_rfm_scores = """
         CREATE OR REPLACE TABLE analysis_rfm_segments AS
         WITH scores AS (
             SELECT 
                 user_id,
-                recency_days,
+                CAST(recency_days AS SMALLINT) as recency_days,
                 frequency_count,
                 monetary_value,
                 -- Invert Recency: Shortest time = Score 5
-                6 - NTILE(5) OVER (ORDER BY recency_days) as r_score,
-                NTILE(5) OVER (ORDER BY frequency_count) as f_score,
-                NTILE(5) OVER (ORDER BY monetary_value) as m_score
+                CAST(6 - NTILE(5) OVER (ORDER BY recency_days) AS TINYINT) as r_score,
+                CAST(NTILE(5) OVER (ORDER BY frequency_count) AS TINYINT) as f_score,
+                CAST(NTILE(5) OVER (ORDER BY monetary_value) AS TINYINT) as m_score
             FROM rfm_base
         )
         SELECT 
             *,
-            -- Concatenate scores for easy lookup (e.g., '555')
-            CAST(r_score AS VARCHAR) || CAST(f_score AS VARCHAR) || CAST(m_score AS VARCHAR) as rfm_code,
+            -- Pack scores for easy lookup (e.g., 555). Widen r_score
+            -- before multiplying: TINYINT * 100 overflows 8-bit
+            -- arithmetic for scores >= 2, the cast must come first
+            CAST(r_score AS SMALLINT) * 100 + f_score * 10 + m_score as rfm_code,
             
             -- RULE-BASED SEGMENTATION LOGIC
-            CASE 
+            CAST(CASE 
                 WHEN (r_score >= 4 AND f_score >= 4) THEN 'Champions'
                 WHEN (r_score >= 3 AND f_score >= 3) THEN 'Loyal Customers'
                 WHEN (r_score >= 4 AND f_score = 1) THEN 'New Customers'
@@ -75,7 +89,7 @@ def perform_segmentation(cfg: DictConfig):
                 WHEN (r_score = 1 AND f_score >= 4) THEN 'Cant Lose Them'
                 WHEN (r_score = 1 AND f_score <= 2) THEN 'Hibernating'
                 ELSE 'At Risk'
-            END as segment_name
+            END AS segment_label) as segment_name
         FROM scores;
         """
         start = time.time()
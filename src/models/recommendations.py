@@ -102,7 +102,52 @@ def build_recommendations(cfg: DictConfig):
         row_count = con.execute("SELECT COUNT(*) FROM predictions_product_affinity").fetchone()[0]
         logger.info(f"Recommendation Table built in {time.time() - start:.2f}s ({row_count:,} rules)")
 
-        # 4. ENRICH WITH METADATA FOR PREVIEW
+        # 4. ENRICH FOR THE DASHBOARD
+        # Same shape as the sample/cloud builders' enriched table, so the
+        # ML Engine page reads one schema whichever database backs it
+        logger.info("   Building predictions_affinity_enriched...")
+        con.execute("""
+        CREATE OR REPLACE TABLE predictions_affinity_enriched AS
+        SELECT
+            r.product_a,
+            pa.brand as brand_a,
+            pa.category_code as category_code_a,
+            r.product_b,
+            pb.brand as brand_b,
+            pb.category_code as category_code_b,
+            pb.current_price as current_price_b,
+            r.pair_count,
+            r.confidence,
+            r.lift
+        FROM predictions_product_affinity r
+        JOIN dim_products pa ON r.product_a = pa.product_id
+        JOIN dim_products pb ON r.product_b = pb.product_id;
+        """)
+
+        # 5. TOP-K PER PRODUCT
+        # Bounded lookup table for the dashboard, mirroring the sample
+        # and cloud builders: at most 6 pre-ranked partners per product
+        logger.info("   Building top_recommendations...")
+        con.execute("""
+        CREATE OR REPLACE TABLE top_recommendations AS
+        SELECT
+            product_a,
+            product_b,
+            brand_b,
+            category_code_b,
+            current_price_b,
+            pair_count,
+            confidence,
+            lift
+        FROM (
+            SELECT *,
+                ROW_NUMBER() OVER (PARTITION BY product_a ORDER BY lift DESC) as rn
+            FROM predictions_affinity_enriched
+        )
+        WHERE rn <= 6;
+        """)
+
+        # 6. PREVIEW WITH METADATA
         logger.info("Generating human-readable preview...")
         
         preview_query = """
@@ -46,17 +46,21 @@ def create_dimensional_models(cfg: DictConfig):
 
         # 2. CREATE FACT_DAILY_KPIS
         logger.info(" Creating 'fact_daily_kpis'...")
+        # Column names match the sample/cloud builders (daily_events,
+        # views, carts, purchases) - the dashboard queries one schema
+        # regardless of which database backs it
         query_daily = """
-        CREATE OR REPLACE TABLE fact_daily_kpis AS 
-        SELECT 
+        CREATE OR REPLACE TABLE fact_daily_kpis AS
+        SELECT
             CAST(event_time AS DATE) as date,
-            COUNT(*) as total_events,
+            COUNT(*) as daily_events,
             COUNT(DISTINCT user_id) as dau,
             COUNT(DISTINCT user_session) as daily_sessions,
+            SUM(CASE WHEN event_type = 'view' THEN 1 ELSE 0 END) as views,
+            SUM(CASE WHEN event_type = 'cart' THEN 1 ELSE 0 END) as carts,
+            SUM(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as purchases,
             SUM(CASE WHEN event_type = 'purchase' THEN price ELSE 0 END) as daily_revenue,
-            SUM(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as total_purchases,
-            SUM(CASE WHEN event_type = 'cart' THEN 1 ELSE 0 END) as total_carts,
-            SUM(CASE WHEN event_type = 'view' THEN 1 ELSE 0 END) as total_views
+            COUNT(DISTINCT CASE WHEN event_type = 'purchase' THEN user_id END) as unique_buyers
         FROM events
         GROUP BY 1
         ORDER BY 1;
@@ -78,8 +82,10 @@ def create_dimensional_models(cfg: DictConfig):
             COUNT(DISTINCT user_session) as session_count,
             SUM(CASE WHEN event_type = 'purchase' THEN price ELSE 0 END) as total_spend,
             SUM(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as purchase_count,
-            -- Boolean flags for easy segmentation later
-            BOOL_OR(event_type = 'purchase') as is_buyer,
+            -- 0/1 flag for easy segmentation later; INT rather than BOOL
+            -- so SUM/AVG rollups work, matching the sample and cloud
+            -- builders' encoding of the same column
+            MAX(CASE WHEN event_type = 'purchase' THEN 1 ELSE 0 END) as is_buyer,
             MAX(CASE WHEN event_type = 'view' THEN category_code END) as favorite_category_by_recency
         FROM events
         GROUP BY user_id;
@@ -89,7 +95,22 @@ def create_dimensional_models(cfg: DictConfig):
         row_count = con.execute("SELECT COUNT(*) FROM dim_users").fetchone()[0]
         logger.info(f" 'dim_users' created in {time.time() - start:.2f}s ({row_count:,} users)")
 
-        # 4. VERIFICATION
+        # 4. CREATE FACT_FUNNEL (3 rows - feeds the dashboard funnel)
+        logger.info(" Creating 'fact_funnel'...")
+        query_funnel = """
+        CREATE OR REPLACE TABLE fact_funnel AS
+        SELECT
+            event_type,
+            COUNT(DISTINCT user_session) as sessions
+        FROM events
+        WHERE event_type IN ('view', 'cart', 'purchase')
+        GROUP BY event_type;
+        """
+        start = time.time()
+        con.execute(query_funnel)
+        logger.info(f" 'fact_funnel' created in {time.time() - start:.2f}s")
+
+        # 5. VERIFICATION
         logger.info(" Verification:")
         tables = con.execute("SHOW TABLES").fetchall()
         logger.info(f"   Tables in DB: {[t[0] for t in tables]}")
@@ -99,7 +120,7 @@ def create_dimensional_models(cfg: DictConfig):
         logger.info(f"   Total Revenue: ${total_rev:,.2f}")
         
         # User stats
-        buyer_count = con.execute("SELECT COUNT(*) FROM dim_users WHERE is_buyer = true").fetchone()[0]
+        buyer_count = con.execute("SELECT COUNT(*) FROM dim_users WHERE is_buyer = 1").fetchone()[0]
         logger.info(f"   Total Buyers: {buyer_count:,}")
 
     except Exception as e:
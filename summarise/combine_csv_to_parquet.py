@@ -1,17 +1,34 @@
 import sys
 import polars as pl
 
+# Narrow types at CSV decode time: the reader parses straight into these
+# dtypes, so the Int64/Utf8 intermediates that optimize_dataset.py would
+# otherwise cast away never materialize. event_time stays Utf8 here -
+# the optimizer parses it once with an explicit format downstream.
+# (Passed as dtypes= - the keyword polars 0.20 uses for this.)
+CSV_DTYPES = {
+    "event_type": pl.Categorical,
+    "product_id": pl.Int32,
+    "price": pl.Float32,
+    "user_id": pl.Int32,
+}
+
 def main():
     csv_path_one = sys.argv[1]
     csv_path_two = sys.argv[2]
     output_parquet = sys.argv[3]
 
-    lazy_one = pl.scan_csv(csv_path_one)
-    lazy_two = pl.scan_csv(csv_path_two)
+    lazy_one = pl.scan_csv(csv_path_one, dtypes=CSV_DTYPES)
+    lazy_two = pl.scan_csv(csv_path_two, dtypes=CSV_DTYPES)
 
     combined = pl.concat([lazy_one, lazy_two])
 
-    combined.sink_parquet(output_parquet)
+    combined.sink_parquet(
+        output_parquet,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=1_000_000,
+    )
 
 if __name__ == "__main__":
     main()
@@ -2,7 +2,17 @@ import polars as pl
 import numpy as np
 from pathlib import Path
 
-def optimize_ecommerce_dataset(input_path: str, output_path: str):
+# ZSTD level per tier. The "hot" file is re-scanned by DuckDB on every
+# pipeline run, and on local NVMe those scans are decompression-bound:
+# L1 decompresses with far less CPU than L3+ at a near-identical ratio.
+# "archive" is for copies written once and rarely read back, where the
+# extra ratio is worth the slower write.
+COMPRESSION_PRESETS = {
+    "hot": 1,
+    "archive": 10,
+}
+
+def optimize_ecommerce_dataset(input_path: str, output_path: str, preset: str = "hot"):
     """
     Optimize large e-commerce dataset for 16GB RAM system
     
@@ -12,6 +22,9 @@ def optimize_ecommerce_dataset(input_path: str, output_path: str):
         Path to input parquet file
     output_path : str
         Path to save optimized parquet file
+    preset : str
+        Compression tier from COMPRESSION_PRESETS: "hot" (ZSTD L1, cheap
+        to re-read) or "archive" (ZSTD L10, smallest file)
     """
     
     print("Starting optimization process...")
@@ -53,12 +66,17 @@ def optimize_ecommerce_dataset(input_path: str, output_path: str):
     # Collect and save with optimized settings
     print("Collecting and optimizing data...")
     
+    # Keep rows clustered by time: event_time arrives sorted from the
+    # source CSVs, so row-group min/max statistics line up with the
+    # date-range scans the dashboard issues, and DuckDB skips whole row
+    # groups. (dim_products is built with arg_max, which needs no sort,
+    # so re-clustering by product_id would only break date pruning.)
     df_optimized.sink_parquet(
         output_path,
         compression="zstd",  # Better compression than snappy
-        compression_level=3,  # Balanced speed/compression (10 was too slow)
+        compression_level=COMPRESSION_PRESETS[preset],
         statistics=True,
-        row_group_size=500_000,  # Larger row groups for better query performance
+        row_group_size=1_000_000,  # Fewer, larger groups: less footer metadata per scan
     )
     
     print(f"Optimized file saved to: {output_path}")